@@ -0,0 +1,50 @@
+import sys
+import unittest
+from pathlib import Path
+
+import tkinter as tk
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from texiteditor import CustomText  # noqa: E402
+
+
+class CustomTextTest(unittest.TestCase):
+    def setUp(self):
+        try:
+            self.root = tk.Tk()
+        except tk.TclError as e:
+            self.skipTest(f"no display available: {e}")
+        self.root.withdraw()
+        self.text = CustomText(self.root)
+
+    def tearDown(self):
+        self.root.destroy()
+
+    def test_insert_goes_through_proxy(self):
+        self.text.insert("1.0", "first\nsecond\nthird")
+        self.assertEqual(self.text.get("1.0", "end-1c"), "first\nsecond\nthird")
+        self.assertEqual(self.text.content_version, 1)
+        self.assertEqual(self.text._dirty_lines, {1, 2, 3})
+
+    def test_delete_and_replace_mark_lines_dirty(self):
+        self.text.insert("1.0", "a\nb\nc")
+        self.text._dirty_lines.clear()
+        self.text.delete("2.0", "2.end")
+        self.text.replace("3.0", "3.end", "x\ny")
+        self.assertEqual(self.text.get("1.0", "end-1c"), "a\n\nx\ny")
+        self.assertEqual(self.text._dirty_lines, {2, 3, 4})
+        self.assertEqual(self.text.content_version, 3)
+
+    def test_bulk_emits_single_content_event(self):
+        seen = []
+        self.text.bind("<<ContentChanged>>", lambda e: seen.append(e), add="+")
+        with self.text.bulk():
+            self.text.insert("end", "one")
+            self.text.insert("end", "two")
+        self.root.update()
+        self.assertEqual(len(seen), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
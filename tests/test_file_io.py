@@ -0,0 +1,114 @@
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import texiteditor  # noqa: E402
+from texiteditor import atomic_write, iter_text_chunks, read_text_file  # noqa: E402
+
+
+class TempDirTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+
+class AtomicWriteTest(TempDirTestCase):
+    def test_creates_and_replaces(self):
+        path = self.dir / "a.txt"
+        atomic_write(path, "one")
+        atomic_write(path, "two\n")
+        self.assertEqual(path.read_text(encoding="utf-8"), "two\n")
+        self.assertEqual(os.listdir(self.dir), ["a.txt"])
+
+    def test_leaves_sibling_tmp_file_alone(self):
+        (self.dir / "a.txt.tmp").write_text("keep")
+        atomic_write(self.dir / "a.txt", "data")
+        self.assertEqual((self.dir / "a.txt.tmp").read_text(), "keep")
+
+    def test_failed_write_keeps_original_and_cleans_up(self):
+        path = self.dir / "a.txt"
+        path.write_text("old")
+        with self.assertRaises(UnicodeEncodeError):
+            atomic_write(path, "lone surrogate \ud800")
+        self.assertEqual(path.read_text(), "old")
+        self.assertEqual(os.listdir(self.dir), ["a.txt"])
+
+    def test_writes_through_symlink(self):
+        target = self.dir / "real.txt"
+        target.write_text("old")
+        link = self.dir / "link.txt"
+        try:
+            link.symlink_to(target)
+        except (OSError, NotImplementedError) as e:
+            self.skipTest(f"symlinks unavailable: {e}")
+        atomic_write(link, "new")
+        self.assertTrue(link.is_symlink())
+        self.assertEqual(target.read_text(), "new")
+
+    @unittest.skipIf(os.name == "nt", "POSIX permission bits")
+    def test_keeps_file_mode(self):
+        path = self.dir / "a.txt"
+        path.write_text("old")
+        os.chmod(path, 0o640)
+        atomic_write(path, "new")
+        self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o640)
+
+    @unittest.skipIf(os.name == "nt", "POSIX permission bits")
+    def test_new_file_gets_umask_default_mode(self):
+        path = self.dir / "a.txt"
+        atomic_write(path, "new")
+        self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o666 & ~texiteditor.UMASK)
+
+
+class ReadTextFileTest(TempDirTestCase):
+    def _write(self, data: bytes) -> Path:
+        path = self.dir / "a.txt"
+        path.write_bytes(data)
+        return path
+
+    def test_small_file_translates_newlines(self):
+        self.assertEqual(read_text_file(self._write(b"a\r\nb\rc\n")), "a\nb\nc\n")
+
+    def test_mmap_path_matches_text_mode(self):
+        path = self._write("x\r\ny\rz\né".encode("utf-8"))
+        with mock.patch.object(texiteditor, "MMAP_THRESHOLD_BYTES", 0):
+            self.assertEqual(read_text_file(path), "x\ny\nz\né")
+
+    def test_mmap_path_rejects_invalid_utf8(self):
+        path = self._write(b"ok\xff")
+        with mock.patch.object(texiteditor, "MMAP_THRESHOLD_BYTES", 0):
+            with self.assertRaises(UnicodeDecodeError):
+                read_text_file(path)
+
+
+class IterTextChunksTest(TempDirTestCase):
+    def test_chunks_join_to_file_text(self):
+        path = self.dir / "a.txt"
+        path.write_bytes("line é\r\n".encode("utf-8") * 1000)
+        chunks = list(iter_text_chunks(path, size=100))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 100 for chunk in chunks))
+        self.assertEqual("".join(chunks), "line é\n" * 1000)
+
+    def test_empty_file(self):
+        path = self.dir / "a.txt"
+        path.write_bytes(b"")
+        self.assertEqual(list(iter_text_chunks(path)), [])
+
+    def test_decode_error_surfaces_while_iterating(self):
+        path = self.dir / "a.txt"
+        path.write_bytes(b"ok\n\xff\n")
+        with self.assertRaises(UnicodeDecodeError):
+            list(iter_text_chunks(path))
+
+if __name__ == "__main__":
+    unittest.main()
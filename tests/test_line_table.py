@@ -0,0 +1,52 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from texiteditor import build_line_starts, index_to_offset, offset_to_index  # noqa: E402
+
+
+class LineTableTest(unittest.TestCase):
+    TEXT = "ab\ncd\n\ne"
+
+    def test_line_starts(self):
+        self.assertEqual(build_line_starts(self.TEXT), [0, 3, 6, 7])
+        self.assertEqual(build_line_starts("ab\n"), [0, 3])
+
+    def test_empty_text(self):
+        starts = build_line_starts("")
+        self.assertEqual(starts, [0])
+        self.assertEqual(offset_to_index(starts, 0), "1.0")
+        self.assertEqual(index_to_offset(starts, "1.0"), 0)
+
+    def test_offset_to_index(self):
+        starts = build_line_starts(self.TEXT)
+        self.assertEqual(offset_to_index(starts, 0), "1.0")
+        self.assertEqual(offset_to_index(starts, 2), "1.2")
+        self.assertEqual(offset_to_index(starts, 3), "2.0")
+        self.assertEqual(offset_to_index(starts, 6), "3.0")
+        self.assertEqual(offset_to_index(starts, -5), "1.0")
+
+    def test_end_of_buffer(self):
+        starts = build_line_starts(self.TEXT)
+        self.assertEqual(offset_to_index(starts, len(self.TEXT)), "4.1")
+        self.assertEqual(index_to_offset(starts, "4.1"), len(self.TEXT))
+        # a trailing newline opens an empty last line
+        starts = build_line_starts("ab\n")
+        self.assertEqual(offset_to_index(starts, 3), "2.0")
+        self.assertEqual(index_to_offset(starts, "2.0"), 3)
+
+    def test_round_trip(self):
+        starts = build_line_starts(self.TEXT)
+        for pos in range(len(self.TEXT) + 1):
+            self.assertEqual(index_to_offset(starts, offset_to_index(starts, pos)), pos)
+
+    def test_index_to_offset_clamps_line(self):
+        starts = build_line_starts(self.TEXT)
+        self.assertEqual(index_to_offset(starts, "0.1"), 1)
+        self.assertEqual(index_to_offset(starts, "9.0"), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
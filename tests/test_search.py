@@ -0,0 +1,38 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from texiteditor import compile_search_pattern  # noqa: E402
+
+
+class CompileSearchPatternTest(unittest.TestCase):
+    def test_literal_needle_is_not_a_regex(self):
+        pattern = compile_search_pattern("a.b(", False, True)
+        self.assertIsNone(pattern.search("axb("))
+        self.assertEqual(pattern.search("xa.b(").span(), (1, 5))
+
+    def test_ignore_case(self):
+        self.assertEqual(compile_search_pattern("Hello", False, False).search("say hELLO").span(), (4, 9))
+        self.assertIsNone(compile_search_pattern("Hello", False, True).search("say hello"))
+
+    def test_search_from_offset(self):
+        pattern = compile_search_pattern("é", False, False)
+        self.assertEqual(pattern.search("éaÉ", 1).span(), (2, 3))
+
+    def test_regex_classes_are_unicode(self):
+        # has to hold whether or not re2 is installed
+        pattern = compile_search_pattern(r"\w+", True, True)
+        self.assertEqual([m.group() for m in pattern.finditer("naïve café")], ["naïve", "café"])
+        self.assertIsNone(compile_search_pattern(r"caf\b", True, True).search("café"))
+
+    def test_backreference(self):
+        self.assertEqual(compile_search_pattern(r"(\w)\1", True, True).search("abba").span(), (1, 3))
+
+    def test_cached(self):
+        self.assertIs(compile_search_pattern("x+", True, False), compile_search_pattern("x+", True, False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,33 +4,46 @@
 # License: MIT
 
 import os
+import re
 import sys
 import json
+import mmap
 import time
+import shutil
+import bisect
 import tempfile
+import functools
 from pathlib import Path
-from typing import Optional, Dict, Any
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
 
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk, font as tkfont
+from tkinter import ttk, font as tkfont
 
 try:
-    from pygments import lex
-    from pygments.lexers import guess_lexer_for_filename, TextLexer
-    from pygments.token import Token
-except Exception:
-    # Graceful message for missing dependency
-    lex = None
-    guess_lexer_for_filename = None
-    TextLexer = None
-    Token = None
+    # Optional linear-time (DFA) regex engine for Find & Replace
+    import re2
+except ImportError:
+    re2 = None
 
 
 APP_NAME = "TexitEditor"
 APP_VERSION = "1.0.0"
 DEFAULT_AUTOSAVE_SECS = 10
+HIGHLIGHT_OVERSCAN_LINES = 20
+HIGHLIGHT_BUDGET_SECS = 0.010
+LOAD_CHUNK_CHARS = 256 * 1024
+MMAP_THRESHOLD_BYTES = 2 * 1024 * 1024
 SETTINGS_DIR = Path.home() / ".texiteditor"
 SETTINGS_FILE = SETTINGS_DIR / "settings.json"
+# Process umask, for giving atomically written new files the usual permissions
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+SYNTAX_TAGS = ("tok-kw", "tok-builtin", "tok-str", "tok-num", "tok-com",
+               "tok-op", "tok-func", "tok-cls", "tok-punc", "tok-text")
 
 
 DEFAULT_SETTINGS = {
@@ -142,62 +155,259 @@ def save_settings(settings: Dict[str, Any]):
         pass
 
 
+def build_line_starts(text: str) -> List[int]:
+    # Absolute offset of the first character of every line
+    starts = [0]
+    starts.extend(m.end() for m in re.finditer("\n", text))
+    return starts
+
+
+def offset_to_index(line_starts: List[int], pos: int) -> str:
+    # Convert absolute int offset to Tk index in O(log lines)
+    pos = max(pos, 0)
+    line = bisect.bisect_right(line_starts, pos)
+    return f"{line}.{pos - line_starts[line - 1]}"
+
+
+def index_to_offset(line_starts: List[int], index: str) -> int:
+    # Convert Tk index ("line.col") to absolute int offset
+    line, col = map(int, index.split("."))
+    line = min(max(line, 1), len(line_starts))
+    return line_starts[line - 1] + col
+
+
+@functools.lru_cache(maxsize=None)
+def get_pygments():
+    # Pygments is only needed once highlighting runs, so import it on first use
+    try:
+        from pygments.lexers import get_lexer_for_filename, TextLexer
+        from pygments.token import Token
+    except Exception:
+        # Graceful message for missing dependency
+        return None
+    return get_lexer_for_filename, TextLexer, Token
+
+
+@functools.lru_cache(maxsize=64)
+def lexer_for_filename(name: str):
+    # Lexer lookup walks the whole Pygments registry, so do it once per file name.
+    # Keyed on the full name so patterns like Makefile or CMakeLists.txt still match.
+    get_lexer_for_filename, TextLexer, _ = get_pygments()
+    try:
+        return get_lexer_for_filename(name)
+    except Exception:
+        return TextLexer()
+
+
+@functools.lru_cache(maxsize=32)
+def compile_search_pattern(needle: str, use_regex: bool, match_case: bool):
+    if re2 is not None and not use_regex:
+        # Only plain needles go to RE2: its \w, \b and \d are ASCII-only,
+        # so user regexes would quietly match differently than with re
+        options = re2.Options()
+        options.literal = True
+        options.case_sensitive = match_case
+        # keep RE2 from printing parse errors to stderr before we fall back
+        options.log_errors = False
+        try:
+            return re2.compile(needle, options)
+        except Exception:
+            pass
+    source = needle if use_regex else re.escape(needle)
+    return re.compile(source, 0 if match_case else re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=None)
+def font_families() -> List[str]:
+    # Querying every installed font is slow and the set does not change during a session
+    return sorted(set(tkfont.families()))
+
+
+def read_text_file(path) -> str:
+    if os.path.getsize(path) > MMAP_THRESHOLD_BYTES:
+        # Decode straight from the mapping, skipping the intermediate read() buffer
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = str(mm, "utf-8")
+        # Same newline translation text mode would have done
+        return data.replace("\r\n", "\n").replace("\r", "\n")
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def iter_text_chunks(path, size: int = 64 * 1024):
+    # Read a text file piecewise so it can be fed to the editor incrementally
+    with open(path, "r", encoding="utf-8", buffering=1 << 20) as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def atomic_write(path: Path, data: str):
+    # Write beside the target and swap it in, so a crash never leaves a half-written file.
+    # Resolve symlinks so the link's target is replaced rather than the link itself.
+    path = Path(path).resolve()
+    tmp = tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    )
+    try:
+        with tmp:
+            tmp.write(data)
+            # the data has to be on disk before the rename makes it visible
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        if path.exists():
+            # keep the original permissions instead of the temp file's 0600
+            shutil.copymode(path, tmp.name)
+        else:
+            os.chmod(tmp.name, 0o666 & ~UMASK)
+        os.replace(tmp.name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+        raise
+
+
 class TextLineNumbers(tk.Canvas):
     def __init__(self, master, text_widget, **kwargs):
         super().__init__(master, **kwargs)
         self.text_widget = text_widget
-        self.text_widget.bind("<<Change>>", self._on_change)
-        self.text_widget.bind("<Configure>", self._on_change)
-        self.text_widget.bind("<MouseWheel>", self._on_change)
-        self.text_widget.bind("<Button-4>", self._on_change)  # Linux scroll up
-        self.text_widget.bind("<Button-5>", self._on_change)  # Linux scroll down
+        self._redraw_after_id = None
+        self._last_view = None
+        # Drawing options, refreshed by set_style rather than queried per line
+        self._font_cached = text_widget["font"]
+        self._fg_cached = text_widget["foreground"]
+        # Canvas text items reused across redraws, one per visible line
+        self._items = []
+        # Wheel scrolling reaches us as <<ScrollChanged>> through the text widget's yview
+        self.text_widget.bind("<<ContentChanged>>", self._on_change, add="+")
+        self.text_widget.bind("<<ScrollChanged>>", self._on_change, add="+")
+        self.text_widget.bind("<Configure>", self._on_change, add="+")
+
+    def set_style(self, font, fg: str):
+        self._font_cached = font
+        self._fg_cached = fg
+        self.delete("all")
+        self._items.clear()
+        self.redraw(force=True)
 
     def _on_change(self, event=None):
+        # Coalesce bursts of scroll/edit events into one redraw once idle
+        if self._redraw_after_id is None:
+            self._redraw_after_id = self.after_idle(self._do_redraw)
+
+    def _do_redraw(self):
+        self._redraw_after_id = None
         self.redraw()
 
-    def redraw(self):
-        self.delete("all")
-        i = self.text_widget.index("@0,0")
+    def redraw(self, force: bool = False):
+        # Nothing to do unless the visible line range could have changed
+        view = (self.text_widget.yview(), self.text_widget.index("end"), self.text_widget.winfo_height())
+        if view == self._last_view and not force:
+            return
+        self._last_view = view
+        items = self._items
+        font = self._font_cached
+        fg = self._fg_cached
+        # wrap="none" means one display line per text line, so just count up
+        line = int(self.text_widget.index("@0,0").split(".")[0])
+        k = 0
         while True:
-            dline = self.text_widget.dlineinfo(i)
+            dline = self.text_widget.dlineinfo(f"{line}.0")
             if dline is None:
                 break
             y = dline[1]
-            linenum = str(i).split(".")[0]
-            self.create_text(4, y, anchor="nw", text=linenum, font=self.text_widget["font"], fill=self.cget("fg"))
-            i = self.text_widget.index(f"{i}+1line")
+            if k < len(items):
+                self.coords(items[k], 4, y)
+                self.itemconfigure(items[k], text=str(line))
+            else:
+                items.append(self.create_text(4, y, anchor="nw", text=str(line), font=font, fill=fg))
+            line += 1
+            k += 1
+        # Drop items left over from a taller viewport
+        for item in items[k:]:
+            self.delete(item)
+        del items[k:]
 
 
 class CustomText(tk.Text):
-    # Text widget that generates <<Change>> virtual event
+    # Text widget that generates <<ContentChanged>>, <<ScrollChanged>> and
+    # <<CursorMoved>> virtual events
     def __init__(self, *args, **kwargs):
         tk.Text.__init__(self, *args, **kwargs)
+        # Lines touched by edits since the highlighter last looked
+        self._dirty_lines = set()
+        # Bumped on every content edit so readers can cache text snapshots
+        self.content_version = 0
+        # While non-zero, no <<ContentChanged>> events are generated
+        self._suspend = 0
 
         self._orig = self._w + "_orig"
         self.tk.call("rename", self._w, self._orig)
         self.tk.createcommand(self._w, self._proxy)
 
+    def suspend_events(self):
+        self._suspend += 1
+
+    def resume_events(self):
+        self._suspend -= 1
+        if not self._suspend:
+            # one catch-up event for everything that happened while suspended
+            self.event_generate("<<ContentChanged>>", when="tail")
+
+    @contextmanager
+    def bulk(self):
+        # Group many edits behind a single <<ContentChanged>>
+        self.suspend_events()
+        try:
+            yield
+        finally:
+            self.resume_events()
+
     def _proxy(self, command, *args):
+        if command in ("insert", "delete", "replace"):
+            first = int(str(self.tk.call(self._orig, "index", args[0])).split(".")[0])
+        elif command == "see":
+            view = self.tk.call(self._orig, "yview")
         # let actual widget perform the requested action
         try:
             result = self.tk.call(self._orig, command, *args)
         except tk.TclError as e:
             raise e
-        # generate an event if something was added or deleted, or scroll, or cursor moved
-        if command in ("insert", "delete", "replace") or \
-           command in ("yview", "scroll") or \
-           command == "mark" and args[0] == "set" and args[1] == "insert":
-            self.event_generate("<<Change>>", when="tail")
+        if command in ("insert", "delete", "replace"):
+            # inserted text alternates with tag lists: insert index chars ?tags chars tags ...?
+            chunks = args[1::2] if command == "insert" else args[2::2] if command == "replace" else ()
+            added = sum(str(chunk).count("\n") for chunk in chunks)
+            self._dirty_lines.update(range(first, first + added + 1))
+            self.content_version += 1
+        # one event per kind of change, so listeners only wake for what they need;
+        # suspending only holds back content events, scrolling still redraws
+        if command in ("insert", "delete", "replace"):
+            if not self._suspend:
+                self.event_generate("<<ContentChanged>>", when="tail")
+        elif command == "yview" and args or \
+             command == "see" and self.tk.call(self._orig, "yview") != view:
+            self.event_generate("<<ScrollChanged>>", when="tail")
+        elif command == "mark" and args[0] == "set" and args[1] == "insert":
+            self.event_generate("<<CursorMoved>>", when="tail")
         return result
 
 
 class FindReplaceDialog(tk.Toplevel):
-    def __init__(self, master, text: tk.Text):
+    def __init__(self, master, text: CustomText):
         super().__init__(master)
         self.title("Find & Replace")
         self.transient(master)
         self.text = text
         self.resizable(False, False)
+        # Snapshot of the buffer, refreshed only after the text is edited
+        self._buf = None
+        self._buf_version = None
+        self._line_starts = None
+        self._end_index = None
 
         self.find_var = tk.StringVar()
         self.replace_var = tk.StringVar()
@@ -230,56 +440,60 @@ class FindReplaceDialog(tk.Toplevel):
         self.bind("<Return>", lambda e: self.find_next())
 
     def _search(self, start="insert"):
-        import re
         needle = self.find_var.get()
         if not needle:
             return None
-        flags = 0 if self.case_var.get() else re.IGNORECASE
-        if self.regex_var.get():
-            pattern = re.compile(needle, flags)
-        else:
-            pattern = re.compile(re.escape(needle), flags)
 
-        text = self.text.get("1.0", "end-1c")
+        text = self._buf_get()
         start_idx = self.text.index(start)
-        start_index = self._index_to_int(start_idx, text)
-        match = pattern.search(text, pos=start_index + 1)
+        start_index = self._index_to_int(start_idx)
+        match = self._find_span(text, needle, start_index + 1)
         if not match:
             # wrap search
-            match = pattern.search(text, pos=0)
+            match = self._find_span(text, needle, 0)
         if not match:
             return None
-        return self._int_to_index(match.start()), self._int_to_index(match.end())
-
-    def _index_to_int(self, index: str, text: str) -> int:
+        return self._int_to_index(match[0]), self._int_to_index(match[1])
+
+    def _buf_get(self) -> str:
+        if self._buf is None or self._buf_version != self.text.content_version:
+            self._buf = self.text.get("1.0", "end-1c")
+            self._buf_version = self.text.content_version
+            self._line_starts = None
+            self._end_index = None
+        return self._buf
+
+    def _line_starts_get(self) -> List[int]:
+        # Built lazily from the same snapshot and dropped along with it
+        text = self._buf_get()
+        if self._line_starts is None:
+            self._line_starts = build_line_starts(text)
+        return self._line_starts
+
+    def _find_span(self, text: str, needle: str, pos: int):
+        if not self.regex_var.get() and self.case_var.get():
+            # plain substring search, no regex engine needed
+            found = text.find(needle, pos)
+            return (found, found + len(needle)) if found >= 0 else None
+        pattern = compile_search_pattern(needle, self.regex_var.get(), self.case_var.get())
+        match = pattern.search(text, pos)
+        return match.span() if match else None
+
+    def _index_to_int(self, index: str) -> int:
         # Convert Tk index to absolute int offset
-        line, col = map(int, index.split("."))
-        lines = text.splitlines(True)  # keepending
-        pos = sum(len(lines[i]) for i in range(min(line - 1, len(lines))))
-        pos += col
-        return pos
+        return index_to_offset(self._line_starts_get(), index)
 
     def _int_to_index(self, pos: int) -> str:
         # Convert absolute int offset to Tk index
-        text = self.text.get("1.0", "end-1c")
-        if pos <= 0:
-            return "1.0"
+        text = self._buf_get()
         if pos >= len(text):
-            last_line = len(text.splitlines())
-            last_col = len(text.splitlines()[-1]) if last_line else 0
-            return f"{max(1,last_line)}.{last_col}"
-        line = 1
-        col = 0
-        for ch in text:
-            if pos == 0:
-                break
-            if ch == "\n":
-                line += 1
-                col = 0
-            else:
-                col += 1
-            pos -= 1
-        return f"{line}.{col}"
+            # end of buffer: str.count/rfind answer this without the line table
+            if self._end_index is None:
+                line = text.count("\n") + 1
+                col = len(text) - text.rfind("\n") - 1
+                self._end_index = f"{line}.{col}"
+            return self._end_index
+        return offset_to_index(self._line_starts_get(), pos)
 
     def find_next(self):
         res = self._search(start="insert")
@@ -298,21 +512,40 @@ class FindReplaceDialog(tk.Toplevel):
             self.find_next()
 
     def replace_all(self):
-        import re
         needle = self.find_var.get()
         repl = self.replace_var.get()
         if not needle:
             return
-        text = self.text.get("1.0", "end-1c")
-        flags = 0 if self.case_var.get() else re.IGNORECASE
-        if self.regex_var.get():
-            pattern = re.compile(needle, flags)
-        else:
-            pattern = re.compile(re.escape(needle), flags)
-        new_text = pattern.sub(repl, text)
-        if new_text != text:
-            self.text.delete("1.0", "end")
-            self.text.insert("1.0", new_text)
+        text = self._buf_get()
+        # Resolve every span to a Tk index before the first edit invalidates the snapshot
+        matches = [(self._int_to_index(start), self._int_to_index(end), value)
+                   for start, end, value in self._find_replacements(text, needle, repl)]
+        if not matches:
+            return
+        # Rewrite only the matched spans, last one first so earlier indexes stay
+        # valid, and group them into a single undo step
+        autoseparators = self.text.cget("autoseparators")
+        self.text.configure(autoseparators=False)
+        try:
+            self.text.edit_separator()
+            with self.text.bulk():
+                for start, end, value in reversed(matches):
+                    self.text.replace(start, end, value)
+            self.text.edit_separator()
+        finally:
+            self.text.configure(autoseparators=autoseparators)
+
+    def _find_replacements(self, text: str, needle: str, repl: str):
+        # Yield (start, end, replacement) for every non-overlapping match
+        if not self.regex_var.get() and self.case_var.get():
+            found = text.find(needle)
+            while found >= 0:
+                yield found, found + len(needle), repl
+                found = text.find(needle, found + len(needle))
+            return
+        pattern = compile_search_pattern(needle, self.regex_var.get(), self.case_var.get())
+        for match in pattern.finditer(text):
+            yield match.start(), match.end(), match.expand(repl) if self.regex_var.get() else repl
 
 
 class FontDialog(tk.Toplevel):
@@ -333,9 +566,8 @@ class FontDialog(tk.Toplevel):
 
         fam_list = tk.Listbox(fam_frame, height=12, exportselection=False)
         fam_list.pack(fill="both", expand=True)
-        families = sorted(set(tkfont.families()))
-        for f in families:
-            fam_list.insert("end", f)
+        families = font_families()
+        fam_list.insert("end", *families)
         if current_family in families:
             idx = families.index(current_family)
             fam_list.selection_set(idx)
@@ -351,8 +583,7 @@ class FontDialog(tk.Toplevel):
         size_list = tk.Listbox(size_frame, height=12, exportselection=False)
         size_list.pack(fill="both", expand=True)
         sizes = [8,9,10,11,12,13,14,16,18,20,22,24,28,32,36]
-        for s in sizes:
-            size_list.insert("end", s)
+        size_list.insert("end", *sizes)
         if current_size in sizes:
             idx = sizes.index(current_size)
             size_list.selection_set(idx)
@@ -379,6 +610,17 @@ class FontDialog(tk.Toplevel):
 
 
 class EditorApp:
+    # (key sequence, handler method name)
+    _SHORTCUTS = (
+        # File
+        ("<Control-n>", "new_file"),
+        ("<Control-o>", "open_file"),
+        ("<Control-s>", "save_file"),
+        ("<Control-S>", "save_file_as"),  # Ctrl+Shift+S
+        # Edit
+        ("<Control-f>", "open_find_replace"),
+    )
+
     def __init__(self, root: tk.Tk):
         self.root = root
         self.root.title(f"{APP_NAME}")
@@ -386,6 +628,10 @@ class EditorApp:
         self.file_path: Optional[Path] = None
         self.dirty = False
         self.settings = load_settings()
+        # Settings writes are coalesced; see _schedule_settings_save
+        self._settings_dirty = False
+        self._settings_after_id = None
+        self._status_after_id = None
         self.theme_key = self.settings.get("theme", "blue")
         self.theme = THEMES.get(self.theme_key, THEMES["blue"])
 
@@ -403,6 +649,7 @@ class EditorApp:
         self.font_family = self.settings.get("font_family", DEFAULT_SETTINGS["font_family"])
         self.font_size = int(self.settings.get("font_size", DEFAULT_SETTINGS["font_size"]))
         self.text_font = tkfont.Font(family=self.font_family, size=self.font_size)
+        self._variant_fonts: Dict[tuple, tkfont.Font] = {}
         self.text.configure(font=self.text_font, insertwidth=2, undo=True, maxundo=-1, autoseparators=True)
 
         # Line numbers initial visibility
@@ -414,7 +661,18 @@ class EditorApp:
 
         # Syntax highlighting debounce
         self._highlight_after_id = None
+        self._highlight_state = None
+        # In-progress tokenizer pass, consumed in time-boxed slices
+        self._hl_iter = None
+        self._hl_step_id = None
+        self._hl_line_starts = None
+        self._hl_skip = 0
+        self._hl_version = None
+        self._cached_lexer = None
+        self._load_after_id = None
         self._autosave_after_id = None
+        # Autosave writes happen off the Tk thread, one at a time
+        self._save_pool = ThreadPoolExecutor(max_workers=1)
 
         # Setup tags and theme
         self.apply_theme()
@@ -423,6 +681,9 @@ class EditorApp:
         if self.settings.get("autosave_enabled", True):
             self.schedule_autosave()
 
+        # Closing the window goes through quit() so pending work is flushed
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
+
     # UI creation
     def _create_menu(self):
         menubar = tk.Menu(self.root)
@@ -522,8 +783,11 @@ class EditorApp:
 
         # Bind modified
         self.text.bind("<<Modified>>", self._on_text_modified)
-        self.text.bind("<<Change>>", self._on_text_changed)
-        self.text.bind("<KeyRelease>", self._schedule_highlight)
+        self.text.bind("<<ContentChanged>>", self._on_text_changed, add="+")
+        # Scrolling or resizing brings unhighlighted lines into view
+        self.text.bind("<<ScrollChanged>>", self._schedule_highlight, add="+")
+        self.text.bind("<Configure>", self._schedule_highlight, add="+")
+        self.text.bind("<<CursorMoved>>", self._update_status_caret, add="+")
         self.text.bind("<ButtonRelease>", self._update_status_caret)
 
     def _create_statusbar(self):
@@ -556,7 +820,7 @@ class EditorApp:
         self.linenumbers.configure(
             background=th["gutter_bg"]
         )
-        self.linenumbers.configure(fg=th["gutter_fg"])
+        self.linenumbers.set_style(self.text_font, th["gutter_fg"])
 
         # Toolbar and statusbar background approximations via ttk style maps
         self.style.configure("TFrame", background=th["gutter_bg"])
@@ -569,7 +833,6 @@ class EditorApp:
         self._configure_syntax_tags()
 
         # Redraw
-        self.linenumbers.redraw()
         self._schedule_highlight()
 
     def _configure_syntax_tags(self):
@@ -580,10 +843,7 @@ class EditorApp:
             if fg:
                 options["foreground"] = fg
             if bold or italic:
-                # configure font variant
-                base = tkfont.Font(font=self.text_font)
-                base.configure(weight=("bold" if bold else "normal"), slant=("italic" if italic else "roman"))
-                options["font"] = base
+                options["font"] = self._get_variant_font(bold, italic)
             self.text.tag_configure(tag, **options)
 
         conf("tok-kw", token_colors["kw"], bold=True)
@@ -597,17 +857,30 @@ class EditorApp:
         conf("tok-punc", token_colors["punc"])
         conf("tok-text", token_colors["text"])
 
+    def _get_variant_font(self, bold: bool, italic: bool) -> tkfont.Font:
+        # Each Font is a Tcl font resource, so build a variant once per face and size
+        key = (bold, italic, self.font_family, self.font_size)
+        font = self._variant_fonts.get(key)
+        if font is None:
+            font = tkfont.Font(font=self.text_font)
+            font.configure(weight=("bold" if bold else "normal"), slant=("italic" if italic else "roman"))
+            self._variant_fonts[key] = font
+        return font
+
     # Events and handlers
     def _on_text_modified(self, event=None):
         self.text.edit_modified(0)
+        if self._load_after_id:
+            # chunks of a file being loaded are not user edits
+            return
         if not self.dirty:
             self.dirty = True
             self._update_title()
         self._update_status_caret()
 
     def _on_text_changed(self, event=None):
-        self.linenumbers.redraw()
         self._update_status_caret()
+        self._schedule_highlight()
 
     def _update_status_caret(self, event=None):
         idx = self.text.index("insert")
@@ -615,103 +888,168 @@ class EditorApp:
         self.caret_label.config(text=f"Ln {line}, Col {col + 1}")
 
     def _schedule_highlight(self, event=None):
+        self._cancel_highlight_pass()
         if self._highlight_after_id:
             self.root.after_cancel(self._highlight_after_id)
         self._highlight_after_id = self.root.after(250, self._highlight_now)
 
+    def _cancel_highlight_pass(self):
+        if self._hl_iter is None:
+            return
+        if self._hl_step_id:
+            self.root.after_cancel(self._hl_step_id)
+            self._hl_step_id = None
+        self._hl_iter = None
+        # the window was only partly tagged, so the next pass must redo it
+        self._highlight_state = None
+
     # Syntax highlighting
     def _get_lexer(self):
-        if lex is None:
+        if get_pygments() is None:
             return None
-        text = self.text.get("1.0", "end-1c")
-        filename = str(self.file_path) if self.file_path else "untitled.txt"
-        try:
-            lexer = guess_lexer_for_filename(filename, text)
-        except Exception:
-            lexer = TextLexer()
-        return lexer
-
-    def _clear_syntax_tags(self):
-        for tag in ("tok-kw","tok-builtin","tok-str","tok-num","tok-com","tok-op","tok-func","tok-cls","tok-punc","tok-text"):
-            self.text.tag_remove(tag, "1.0", "end")
+        if self._cached_lexer is None:
+            name = self.file_path.name if self.file_path else "untitled.txt"
+            self._cached_lexer = lexer_for_filename(name)
+        return self._cached_lexer
+
+    # Token mapping, memoized per token type (Pygments token types are singletons)
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _tag_for(toktype):
+        Token = get_pygments()[2]
+        if toktype in Token.Keyword:
+            return "tok-kw"
+        if toktype in Token.Name.Builtin:
+            return "tok-builtin"
+        if toktype in Token.Literal.String:
+            return "tok-str"
+        if toktype in Token.Literal.Number:
+            return "tok-num"
+        if toktype in Token.Comment:
+            return "tok-com"
+        if toktype in Token.Operator:
+            return "tok-op"
+        if toktype in Token.Punctuation:
+            return "tok-punc"
+        if toktype in Token.Name.Function:
+            return "tok-func"
+        if toktype in Token.Name.Class:
+            return "tok-cls"
+        return "tok-text"
+
+    def _clear_syntax_tags(self, start="1.0", end="end"):
+        # One Tcl evaluation instead of a round-trip per tag
+        self.text.tk.eval("\n".join(f"{self.text._w} tag remove {tag} {start} {end}" for tag in SYNTAX_TAGS))
+
+    def _visible_lines(self):
+        # First and last line worth highlighting: the viewport plus some overscan
+        top = int(self.text.index("@0,0").split(".")[0])
+        bottom = int(self.text.index(f"@0,{self.text.winfo_height()}").split(".")[0])
+        return max(1, top - HIGHLIGHT_OVERSCAN_LINES), bottom + HIGHLIGHT_OVERSCAN_LINES
 
     def _highlight_now(self):
         self._highlight_after_id = None
-        if lex is None:
+        if get_pygments() is None:
             # Pygments not installed, skip highlighting
             return
 
-        self._clear_syntax_tags()
-        content = self.text.get("1.0", "end-1c")
-        if not content.strip():
-            return
-
         lexer = self._get_lexer()
         if lexer is None:
             return
 
-        # Token mapping
-        def tag_for(toktype):
-            if toktype in Token.Keyword:
-                return "tok-kw"
-            if toktype in Token.Name.Builtin:
-                return "tok-builtin"
-            if toktype in Token.Literal.String:
-                return "tok-str"
-            if toktype in Token.Literal.Number:
-                return "tok-num"
-            if toktype in Token.Comment:
-                return "tok-com"
-            if toktype in Token.Operator:
-                return "tok-op"
-            if toktype in Token.Punctuation:
-                return "tok-punc"
-            if toktype in Token.Name.Function:
-                return "tok-func"
-            if toktype in Token.Name.Class:
-                return "tok-cls"
-            return "tok-text"
-
-        # Apply tags by walking text via index math
-        index = "1.0"
-        pos = 0
-        for toktype, value in lex(content, lexer):
-            length = len(value)
-            if length == 0:
-                continue
-            # Compute start and end indexes
-            start_index = self._int_to_index(pos, content)
-            end_index = self._int_to_index(pos + length, content)
-            self.text.tag_add(tag_for(toktype), start_index, end_index)
-            pos += length
-
-    def _int_to_index(self, pos: int, text: str) -> str:
-        if pos <= 0:
-            return "1.0"
-        if pos >= len(text):
-            lines = text.splitlines()
-            if not lines:
-                return "1.0"
-            return f"{len(lines)}.{len(lines[-1])}"
-        line = 1
-        col = 0
-        for ch in text:
-            if pos == 0:
+        # Only the viewport is tagged; skip entirely when it has neither
+        # moved nor been edited since the last pass. Edits above it count
+        # too, since they can open or close a string or comment.
+        first, last = self._visible_lines()
+        dirty = self.text._dirty_lines
+        state = (first, last, lexer)
+        if state == self._highlight_state and not any(ln <= last for ln in dirty):
+            dirty.clear()
+            return
+        self._highlight_state = state
+        dirty.clear()
+
+        start, end = f"{first}.0", f"{last}.end"
+        self._clear_syntax_tags(start, end)
+        # The viewport may begin inside a docstring or block comment, and 1.0
+        # is the only place the lexer state is known, so lex from there and
+        # drop the tokens that end above the viewport
+        content = self.text.get("1.0", end)
+        line_starts = build_line_starts(content)
+        skip = line_starts[first - 1]
+        if not content[skip:].strip():
+            return
+
+        self._hl_iter = lexer.get_tokens_unprocessed(content)
+        self._hl_line_starts = line_starts
+        self._hl_skip = skip
+        self._hl_version = self.text.content_version
+        self._highlight_step()
+
+    def _highlight_step(self):
+        # Tokenize for at most HIGHLIGHT_BUDGET_SECS, tag what was found, then
+        # yield to the event loop and continue from the same token stream
+        self._hl_step_id = None
+        tokens = self._hl_iter
+        if tokens is None:
+            return
+        if self._hl_version != self.text.content_version:
+            self._cancel_highlight_pass()
+            self._schedule_highlight()
+            return
+
+        tag_for = self._tag_for
+        skip = self._hl_skip
+        perf_counter = time.perf_counter
+        deadline = perf_counter() + HIGHLIGHT_BUDGET_SECS
+        finished = True
+
+        # Collect offset ranges per tag, merging runs of the same tag.
+        # Hot loop: everything it touches is bound to a local first.
+        ranges = defaultdict(list)
+        for n, (pos, toktype, value) in enumerate(tokens):
+            stop = pos + len(value)
+            # tokens ending above the viewport were only lexed for their state
+            if value and stop > skip:
+                if pos < skip:
+                    pos = skip
+                tag_ranges = ranges[tag_for(toktype)]
+                if tag_ranges and tag_ranges[-1] == pos:
+                    tag_ranges[-1] = stop
+                else:
+                    tag_ranges += (pos, stop)
+            # checking the clock every token would cost more than it saves
+            if not n & 63 and perf_counter() > deadline:
+                finished = False
                 break
-            if ch == "\n":
-                line += 1
-                col = 0
-            else:
-                col += 1
-            pos -= 1
-        return f"{line}.{col}"
+
+        self._apply_tag_ranges(ranges)
+        if finished:
+            self._hl_iter = None
+        else:
+            self._hl_step_id = self.root.after_idle(self._highlight_step)
+
+    def _apply_tag_ranges(self, ranges):
+        # Tk's "tag add" accepts many index pairs, so issue one call per tag
+        line_starts = self._hl_line_starts
+        bisect_right = bisect.bisect_right
+        call = self.text.tk.call
+        widget = self.text._w
+        for tag, offsets in ranges.items():
+            indexes = []
+            for off in offsets:
+                line = bisect_right(line_starts, off)
+                indexes.append(f"{line}.{off - line_starts[line - 1]}")
+            call(widget, "tag", "add", tag, *indexes)
 
     # File operations
     def new_file(self, event=None):
         if not self._maybe_save_changes():
             return
+        self._cancel_load()
         self.text.delete("1.0", "end")
         self.file_path = None
+        self._cached_lexer = None
         self.dirty = False
         self._update_title()
         self._schedule_highlight()
@@ -731,50 +1069,117 @@ class EditorApp:
             ("C/C++", "*.c;*.h;*.cpp;*.hpp"),
             ("Java", "*.java"),
         ]
+        from tkinter import filedialog
         path = filedialog.askopenfilename(title="Open File", filetypes=filetypes)
         if not path:
             return
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = f.read()
-            self.text.delete("1.0", "end")
-            self.text.insert("1.0", data)
-            self.file_path = Path(path)
-            self.dirty = False
-            self._update_title()
-            self._schedule_highlight()
-            self.status(f"Opened {self.file_path.name}")
+            data = read_text_file(path)
         except Exception as e:
+            from tkinter import messagebox
             messagebox.showerror(APP_NAME, f"Failed to open file:\n{e}")
+            return
+        self._cancel_load()
+        self.text.delete("1.0", "end")
+        self.file_path = Path(path)
+        self._cached_lexer = None
+        self.dirty = False
+        self._update_title()
+        chunks = (data[i:i + LOAD_CHUNK_CHARS] for i in range(0, len(data), LOAD_CHUNK_CHARS))
+        self._stream_insert(chunks, self._finish_load)
+
+    def _stream_insert(self, chunks, on_done):
+        # Feed the text widget one chunk per idle callback so the UI keeps
+        # handling events while a large file loads. The widget stays read-only
+        # between chunks so typing cannot get mixed into the file's text.
+        self.text.suspend_events()
+        self.text.configure(state="disabled")
+        self._load_after_id = self.root.after_idle(self._load_step, chunks, on_done)
+
+    def _load_step(self, chunks, on_done):
+        try:
+            chunk = next(chunks, None)
+        except Exception as e:
+            # keep whatever was read, but detach it from the file so a later
+            # save cannot overwrite the original with a truncated copy
+            self._load_after_id = None
+            self.text.configure(state="normal")
+            self.text.resume_events()
+            self.file_path = None
+            self._cached_lexer = None
+            self._update_title()
+            self.status(f"Failed to load file: {e}")
+            from tkinter import messagebox
+            messagebox.showerror(APP_NAME, f"Failed to open file:\n{e}")
+            return
+        if chunk is not None:
+            self.text.configure(state="normal")
+            self.text.insert("end", chunk)
+            self.text.configure(state="disabled")
+            # the highlighter starts from scratch once loading is done
+            self.text._dirty_lines.clear()
+            self._load_after_id = self.root.after_idle(self._load_step, chunks, on_done)
+            return
+        self._load_after_id = None
+        self.text.configure(state="normal")
+        self.text.resume_events()
+        on_done()
+
+    def _cancel_load(self):
+        if self._load_after_id:
+            self.root.after_cancel(self._load_after_id)
+            self._load_after_id = None
+            self.text.configure(state="normal")
+            self.text.resume_events()
+
+    def _finish_load(self):
+        self.text.edit_reset()
+        self.dirty = False
+        self._update_title()
+        self._highlight_state = None
+        self._schedule_highlight()
+        self.status(f"Opened {self.file_path.name}")
 
     def save_file(self, event=None):
+        if self._load_after_id:
+            self.status("Still loading, try again in a moment")
+            return False
         if self.file_path is None:
             return self.save_file_as()
         try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                f.write(self.text.get("1.0", "end-1c"))
+            # Queue behind any autosave still in flight so an older snapshot
+            # cannot land on top of this save
+            future = self._save_pool.submit(atomic_write, self.file_path, self.text.get("1.0", "end-1c"))
+            future.result()
             self.dirty = False
             self._update_title()
             self.status(f"Saved {self.file_path.name}")
             return True
         except Exception as e:
+            from tkinter import messagebox
             messagebox.showerror(APP_NAME, f"Failed to save file:\n{e}")
             return False
 
     def save_file_as(self, event=None):
+        if self._load_after_id:
+            self.status("Still loading, try again in a moment")
+            return False
         filetypes = [
             ("Text Files", "*.txt"),
             ("All Files", "*.*"),
         ]
+        from tkinter import filedialog
         path = filedialog.asksaveasfilename(title="Save As", defaultextension=".txt", filetypes=filetypes)
         if not path:
             return False
         self.file_path = Path(path)
+        self._cached_lexer = None
         return self.save_file()
 
     def _maybe_save_changes(self) -> bool:
         if not self.dirty:
             return True
+        from tkinter import messagebox
         resp = messagebox.askyesnocancel(APP_NAME, "You have unsaved changes. Save now?")
         if resp is None:
             return False
@@ -791,29 +1196,54 @@ class EditorApp:
 
     def _autosave_tick(self):
         self._autosave_after_id = None
+        if self._load_after_id:
+            # never write out a half-loaded buffer; try again next tick
+            self.schedule_autosave()
+            return
         if self.settings.get("autosave_enabled", True):
             try:
                 if self.file_path:
                     # Save directly to file to prevent data loss
                     if self.dirty:
-                        self.save_file()
+                        self._autosave_async(self.file_path)
                 else:
                     # Save to temp
                     tmp_dir = Path(tempfile.gettempdir()) / "texiteditor_autosave"
                     tmp_dir.mkdir(exist_ok=True)
                     tmp_file = tmp_dir / f"untitled_{int(time.time())}.txt"
-                    with open(tmp_file, "w", encoding="utf-8") as f:
-                        f.write(self.text.get("1.0", "end-1c"))
-                self.status("Auto-saved")
+                    self._autosave_async(tmp_file)
             except Exception:
                 pass
             finally:
                 self.schedule_autosave()
 
+    def _autosave_async(self, path: Path):
+        # Snapshot on the Tk thread, write on the pool thread
+        data = self.text.get("1.0", "end-1c")
+        version = self.text.content_version
+        future = self._save_pool.submit(atomic_write, path, data)
+        self._poll_autosave(future, path, version)
+
+    def _poll_autosave(self, future, path: Path, version: int):
+        # The worker never touches Tk; the Tk thread checks on it instead
+        if not future.done():
+            self.root.after(50, self._poll_autosave, future, path, version)
+            return
+        self._autosave_done(future, path, version)
+
+    def _autosave_done(self, future, path: Path, version: int):
+        if future.exception() is not None:
+            return
+        # Only clear the dirty mark if nothing was typed while the write was running
+        if path == self.file_path and version == self.text.content_version:
+            self.dirty = False
+            self._update_title()
+        self.status("Auto-saved")
+
     def toggle_autosave(self):
         enabled = not self.settings.get("autosave_enabled", True)
         self.settings["autosave_enabled"] = enabled
-        save_settings(self.settings)
+        self._schedule_settings_save()
         if enabled:
             self.schedule_autosave()
             self.status("Auto-save enabled")
@@ -829,7 +1259,7 @@ class EditorApp:
                           initialvalue=int(self.settings.get("autosave_secs", DEFAULT_AUTOSAVE_SECS)))
         if secs:
             self.settings["autosave_secs"] = int(secs)
-            save_settings(self.settings)
+            self._schedule_settings_save()
             if self.settings.get("autosave_enabled", True):
                 self.schedule_autosave()
             self.status(f"Auto-save interval set to {secs}s")
@@ -841,12 +1271,15 @@ class EditorApp:
     def _toggle_line_numbers(self, force_value: Optional[bool] = None):
         val = self.show_line_numbers if force_value is None else force_value
         self.show_line_numbers = val
-        if self.show_line_numbers:
+        # Only touch geometry when the gutter's packed state actually flips
+        packed = bool(self.linenumbers.winfo_manager())
+        if val and not packed:
             self.linenumbers.pack(side="left", fill="y")
-        else:
+        elif not val and packed:
             self.linenumbers.pack_forget()
-        self.settings["show_line_numbers"] = self.show_line_numbers
-        save_settings(self.settings)
+        if self.settings.get("show_line_numbers") != val:
+            self.settings["show_line_numbers"] = val
+            self._schedule_settings_save()
 
     # Font and theme
     def change_font(self):
@@ -856,13 +1289,17 @@ class EditorApp:
         fam = dlg.selected_family.get()
         size = dlg.selected_size.get()
         if fam and size:
+            if (fam, int(size)) != (self.font_family, self.font_size):
+                # cached bold/italic variants belong to the old face
+                self._variant_fonts.clear()
             self.font_family = fam
             self.font_size = int(size)
             self.text_font.configure(family=self.font_family, size=self.font_size)
             self._configure_syntax_tags()
+            self.linenumbers.redraw(force=True)
             self.settings["font_family"] = self.font_family
             self.settings["font_size"] = self.font_size
-            save_settings(self.settings)
+            self._schedule_settings_save()
 
     def set_theme(self, key: str):
         if key not in THEMES:
@@ -871,7 +1308,7 @@ class EditorApp:
         self.theme = THEMES[key]
         self.apply_theme()
         self.settings["theme"] = key
-        save_settings(self.settings)
+        self._schedule_settings_save()
 
     # Find & Replace
     def open_find_replace(self, event=None):
@@ -885,27 +1322,46 @@ class EditorApp:
 
     def status(self, text: str):
         self.status_label.config(text=text)
-        # reset after a while
-        self.root.after(3000, lambda: self.status_label.config(text="Ready"))
+        # reset after a while, restarting the timer rather than stacking another
+        if self._status_after_id is not None:
+            self.root.after_cancel(self._status_after_id)
+        self._status_after_id = self.root.after(3000, self._reset_status)
+
+    def _reset_status(self):
+        self._status_after_id = None
+        self.status_label.config(text="Ready")
 
     def about(self):
+        from tkinter import messagebox
         messagebox.showinfo(
             f"About {APP_NAME}",
             f"{APP_NAME} v{APP_VERSION}\n\nA modern text editor with a retro vibe.\nSyntax highlighting powered by Pygments."
         )
 
     def _bind_shortcuts(self):
-        # File
-        self.root.bind("<Control-n>", self.new_file)
-        self.root.bind("<Control-o>", self.open_file)
-        self.root.bind("<Control-s>", self.save_file)
-        self.root.bind("<Control-S>", self.save_file_as)  # Ctrl+Shift+S
-        # Edit
-        self.root.bind("<Control-f>", self.open_find_replace)
+        for sequence, handler in self._SHORTCUTS:
+            self.root.bind(sequence, getattr(self, handler))
         # Undo/Redo handled by default bindings
 
+    def _schedule_settings_save(self):
+        # Rapid toggles and dialog changes collapse into one write
+        self._settings_dirty = True
+        if self._settings_after_id is None:
+            self._settings_after_id = self.root.after(500, self._flush_settings)
+
+    def _flush_settings(self):
+        if self._settings_after_id is not None:
+            self.root.after_cancel(self._settings_after_id)
+            self._settings_after_id = None
+        if self._settings_dirty:
+            self._settings_dirty = False
+            save_settings(self.settings)
+
     def quit(self):
         if self._maybe_save_changes():
+            self._flush_settings()
+            # Let a pending autosave finish before tearing down Tk
+            self._save_pool.shutdown(wait=True)
             self.root.destroy()
 
 
@@ -913,16 +1369,13 @@ def main():
     root = tk.Tk()
     app = EditorApp(root)
     if len(sys.argv) > 1:
-        try:
-            path = sys.argv[1]
-            if os.path.isfile(path):
-                with open(path, "r", encoding="utf-8") as f:
-                    app.text.insert("1.0", f.read())
-                app.file_path = Path(path)
-                app._update_title()
-                app._schedule_highlight()
-        except Exception:
-            pass
+        path = sys.argv[1]
+        if os.path.isfile(path):
+            app.file_path = Path(path)
+            app._cached_lexer = None
+            app._update_title()
+            # Stream the file in once the window is up instead of blocking startup
+            app._stream_insert(iter_text_chunks(path), app._finish_load)
     root.mainloop()
 
 